@@ -0,0 +1,25 @@
+import runpy
+import sys
+
+# Entry point of the pytools.pyz zipapp (see build_zipapp.py); each command
+# runs the matching script exactly as `python <script>.py` would.
+COMMANDS = {
+    "cmake": "setup_cmake",
+    "ninja": "setup_ninja",
+    "clang": "setup_compiler",
+    "vulkan": "setup_vulkan",
+    "vs2022": "setup_vs2022",
+    "verify": "verify_install",
+    "staged": "staged_install",
+    "prefetch": "prefetch",
+}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in COMMANDS:
+        sys.stderr.write(f"Usage: pytools.pyz {{{','.join(COMMANDS)}}} [args...]\n")
+        sys.exit(2)
+
+    module_name = COMMANDS[sys.argv[1]]
+    sys.argv = [module_name] + sys.argv[2:]
+    runpy.run_module(module_name, run_name="__main__", alter_sys=True)
@@ -0,0 +1,388 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tarfile
+import zlib
+from pathlib import Path
+
+# Release archives are kept here so re-provisioning, repairs and container
+# rebuilds do not download them again. Caching is opt-in via PYTOOLS_CACHE_DIR.
+CACHE_DIR_ENV = "PYTOOLS_CACHE_DIR"
+# Set to 1 to transcode cached zips once into tar.zst for faster re-extraction.
+# This needs Python 3.14+ or the zstandard package, and setup.ps1 provisions
+# Python 3.13 while the zipapp only vendors pure-Python wheels. So with the
+# shipped setup, repacking is skipped with a warning and installs extract from
+# the cached zip; it only takes effect when run from an interpreter that has zstd.
+REPACK_ENV = "PYTOOLS_CACHE_REPACK"
+
+REPACK_SUFFIX = ".tar.zst"
+ZSTD_LEVEL = 10
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class ArchiveCorrupted(Exception):
+    pass
+
+
+def print(*args, **kwargs):
+    # rich is only imported once something is actually rendered
+    from rich import print as rich_print
+    rich_print(*args, **kwargs)
+
+
+def print_header(message):
+    print(f"[cyan]{message}[/cyan]")
+
+
+def print_step(message):
+    print(f"[bright_blue]{message}[/bright_blue]")
+
+
+def print_success(message):
+    print(f"[bright_green]{message}[/bright_green]")
+
+
+def print_error(message):
+    print(f"[red]{message}[/red]")
+    sys.exit(1)
+
+
+def print_error_prompt(message):
+    print(f"[red]{message}[/red]")
+
+
+def print_warning(message):
+    print(f"[bright_yellow]{message}[/bright_yellow]")
+
+
+def is_cache_enabled():
+    return bool(os.environ.get(CACHE_DIR_ENV))
+
+
+def is_repack_enabled():
+    return os.environ.get(REPACK_ENV) == "1"
+
+
+def get_cache_dir():
+    return Path(os.environ[CACHE_DIR_ENV])
+
+
+def get_artifact_dir(url):
+    # Asset names repeat across releases (e.g. ninja-win.zip), so key by URL
+    return get_cache_dir() / hashlib.sha256(url.encode()).hexdigest()[:16]
+
+
+def get_artifact_path(url):
+    return get_artifact_dir(url) / url.rsplit('/', 1)[-1]
+
+
+def get_metadata_path(artifact_path):
+    return artifact_path.with_name(f"{artifact_path.name}.json")
+
+
+def load_metadata(artifact_path):
+    try:
+        with open(get_metadata_path(artifact_path), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_metadata(artifact_path, metadata):
+    metadata_path = get_metadata_path(artifact_path)
+    temp_path = metadata_path.with_name(f"{metadata_path.name}.tmp")
+    with open(temp_path, 'w') as f:
+        json.dump(metadata, f)
+    os.replace(temp_path, metadata_path)
+
+
+def get_repacked_path(artifact_path):
+    return artifact_path.with_name(f"{artifact_path.stem}{REPACK_SUFFIX}")
+
+
+def get_file_sha256(path):
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(COPY_BUFFER_SIZE):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def verify_artifact(path):
+    # Size is checked against Content-Length while downloading; zips additionally
+    # get a full CRC pass so a corrupt download is never published to the cache.
+    import zipfile
+
+    if path.name.endswith(".zip.part") or path.suffix == ".zip":
+        try:
+            with zipfile.ZipFile(path, 'r') as zip_ref:
+                bad_member = zip_ref.testzip()
+        except zipfile.BadZipFile as e:
+            raise ArchiveCorrupted(f"{path.name} is not a valid zip: {e}")
+        if bad_member is not None:
+            raise ArchiveCorrupted(f"CRC mismatch for {bad_member} in {path.name}")
+
+
+def download_artifact(url, artifact_path, conditional=False, verify=False):
+    """Download url into the cache; returns False if a conditional request found it unchanged."""
+    import requests
+
+    headers = {}
+    metadata = load_metadata(artifact_path)
+    if conditional and artifact_path.is_file():
+        if metadata.get("etag"):
+            headers["If-None-Match"] = metadata["etag"]
+        if metadata.get("last_modified"):
+            headers["If-Modified-Since"] = metadata["last_modified"]
+
+    artifact_path.parent.mkdir(parents=True, exist_ok=True)
+    part_path = artifact_path.with_name(f"{artifact_path.name}.part")
+    sha256 = hashlib.sha256()
+    with requests.get(url, stream=True, headers=headers) as response:
+        if response.status_code == 304:
+            return False
+        response.raise_for_status()
+        with open(part_path, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=COPY_BUFFER_SIZE):
+                sha256.update(chunk)
+                f.write(chunk)
+
+        expected_size = response.headers.get("Content-Length")
+        if expected_size and "Content-Encoding" not in response.headers \
+                and int(expected_size) != part_path.stat().st_size:
+            part_path.unlink()
+            raise ArchiveCorrupted(f"Truncated download of {url}")
+
+    if verify:
+        try:
+            verify_artifact(part_path)
+        except ArchiveCorrupted:
+            part_path.unlink()
+            raise
+
+    # Publish the file only once it is complete
+    os.replace(part_path, artifact_path)
+    save_metadata(artifact_path, {
+        "url": url,
+        "sha256": sha256.hexdigest(),
+        "size": artifact_path.stat().st_size,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    })
+    return True
+
+
+def fetch_artifact(url):
+    """Return the cached copy of url, downloading it first if it is missing or incomplete."""
+    artifact_path = get_artifact_path(url)
+    metadata = load_metadata(artifact_path)
+    if artifact_path.is_file() and metadata.get("size") == artifact_path.stat().st_size:
+        if get_file_sha256(artifact_path) == metadata.get("sha256"):
+            print_success(f"Using cached {artifact_path.name}.")
+            return artifact_path
+        print_warning(f"Cached {artifact_path.name} does not match its recorded sha256, downloading it again...")
+
+    print_step(f"Downloading {artifact_path.name} into the artifact cache...")
+    download_artifact(url, artifact_path, verify=True)
+    print_success("Download completed successfully.")
+    return artifact_path
+
+
+def refresh_artifact(url):
+    """Stage the latest copy of url in the cache, verified; returns True if it changed."""
+    artifact_path = get_artifact_path(url)
+    updated = download_artifact(url, artifact_path, conditional=True, verify=True)
+    if artifact_path.suffix == ".zip" and is_repack_enabled() and get_zstd_module() is not None:
+        repack_artifact(artifact_path)
+    return updated
+
+
+def copy_from_cache(url, dest_path):
+    # Installers delete their downloaded file afterwards, so hand them a copy
+    shutil.copyfile(fetch_artifact(url), dest_path)
+
+
+def discard_artifact(url):
+    # Drops the download, its repack and their metadata
+    shutil.rmtree(get_artifact_dir(url), ignore_errors=True)
+
+
+def prune_cache(keep_urls):
+    """Remove cached artifacts whose URL is no longer configured."""
+    keep_dirs = {get_artifact_dir(url) for url in keep_urls}
+    removed = []
+    for artifact_dir in get_cache_dir().iterdir():
+        if artifact_dir.is_dir() and artifact_dir not in keep_dirs:
+            shutil.rmtree(artifact_dir, ignore_errors=True)
+            removed.append(artifact_dir.name)
+    return removed
+
+
+def get_zstd_module():
+    # Python 3.14+ ships zstd in the standard library; older versions need the
+    # optional zstandard package. Without either, archives are not repacked.
+    try:
+        from compression import zstd
+        return zstd
+    except ImportError:
+        pass
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        return None
+
+
+def open_zstd(path, mode):
+    zstd = get_zstd_module()
+    if zstd is None:
+        raise ImportError("zstd support requires Python 3.14+ or the zstandard package")
+
+    if hasattr(zstd, "ZstdFile"):
+        return zstd.ZstdFile(path, mode, level=ZSTD_LEVEL if mode == 'wb' else None)
+    if mode == 'wb':
+        return zstd.ZstdCompressor(level=ZSTD_LEVEL, threads=-1).stream_writer(open(path, 'wb'), closefd=True)
+    return zstd.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+
+
+def repack_artifact(artifact_path):
+    """Transcode a cached zip into tar.zst once and return the repacked path.
+
+    Member names and CRC32s go into the sidecar metadata rather than per-member
+    PAX headers, which keeps tar header parsing off the extraction hot path while
+    still letting installs check and record every file.
+    """
+    import zipfile
+
+    repacked_path = get_repacked_path(artifact_path)
+    metadata = load_metadata(artifact_path)
+    repacked_metadata = load_metadata(repacked_path)
+    if repacked_path.is_file() and repacked_metadata.get("source_sha256") == metadata.get("sha256"):
+        return repacked_path
+
+    print_step(f"Repacking {artifact_path.name} to {repacked_path.name}...")
+    part_path = repacked_path.with_name(f"{repacked_path.name}.part")
+    with zipfile.ZipFile(artifact_path, 'r') as zip_ref, open_zstd(part_path, 'wb') as compressed, \
+            tarfile.open(fileobj=compressed, mode='w|', format=tarfile.GNU_FORMAT) as tar_ref:
+        member_names = zip_ref.namelist()
+        crcs = {info.filename: info.CRC for info in zip_ref.infolist() if not info.is_dir()}
+        for info in sorted(zip_ref.infolist(), key=lambda member: member.header_offset):
+            tar_info = tarfile.TarInfo(info.filename.rstrip('/'))
+            if info.is_dir():
+                tar_info.type = tarfile.DIRTYPE
+                tar_info.mode = 0o755
+                tar_ref.addfile(tar_info)
+                continue
+
+            tar_info.size = info.file_size
+            tar_info.mode = 0o644
+            with zip_ref.open(info) as src:
+                tar_ref.addfile(tar_info, src)
+
+    os.replace(part_path, repacked_path)
+    # Member names are recorded so selection does not need a decompression pass
+    save_metadata(repacked_path, {
+        "source_sha256": metadata.get("sha256"),
+        "size": repacked_path.stat().st_size,
+        "members": member_names,
+        "crcs": crcs,
+    })
+    print_success(f"Repacked {artifact_path.stat().st_size / 2 ** 20:.1f} MiB zip into "
+                  f"{repacked_path.stat().st_size / 2 ** 20:.1f} MiB {repacked_path.name}.")
+    return repacked_path
+
+
+def get_extraction_source(url):
+    """Return the fastest cached archive for url: the tar.zst repack when enabled, else the zip."""
+    artifact_path = fetch_artifact(url)
+    if is_repack_enabled():
+        if get_zstd_module() is not None:
+            return repack_artifact(artifact_path)
+        print_warning("zstd is unavailable (needs Python 3.14+ or zstandard), extracting from the zip.")
+    return artifact_path
+
+
+def get_corruption_errors():
+    import zipfile
+
+    errors = (ArchiveCorrupted, zipfile.BadZipFile, tarfile.TarError, EOFError)
+    zstd = get_zstd_module()
+    if zstd is not None:
+        errors += (zstd.ZstdError,)
+    return errors
+
+
+def extract_cached_artifact(url, dest_path, get_select):
+    """Extract url from the cache with the selector get_select(archive_path) returns.
+
+    A cached copy that turns out to be corrupt is discarded and downloaded once
+    more, so a bad cache entry does not fail every later install.
+    """
+    for attempt in range(2):
+        archive_path = get_extraction_source(url)
+        try:
+            return extract_archive(archive_path, dest_path, get_select(archive_path))
+        except get_corruption_errors() as e:
+            if attempt:
+                raise ArchiveCorrupted(f"{archive_path.name} is corrupt: {e}") from e
+            print_warning(f"Cached {archive_path.name} is corrupt ({e}), downloading it again...")
+            discard_artifact(url)
+
+
+def list_archive_names(archive_path):
+    import zipfile
+
+    if archive_path.name.endswith(REPACK_SUFFIX):
+        return load_metadata(archive_path)["members"]
+
+    with zipfile.ZipFile(archive_path, 'r') as zip_ref:
+        return zip_ref.namelist()
+
+
+def iter_archive_files(archive_path):
+    """Yield (name, size, crc32, file object) for each file in a cached zip or tar.zst, in archive order."""
+    import zipfile
+
+    if archive_path.name.endswith(REPACK_SUFFIX):
+        crcs = load_metadata(archive_path)["crcs"]
+        # Streamed in one pass; tar members are read strictly in order
+        with open_zstd(archive_path, 'rb') as compressed, tarfile.open(fileobj=compressed, mode='r|') as tar_ref:
+            for member in tar_ref:
+                if member.isfile():
+                    yield member.name, member.size, crcs.get(member.name), tar_ref.extractfile(member)
+        return
+
+    with zipfile.ZipFile(archive_path, 'r') as zip_ref:
+        for info in sorted(zip_ref.infolist(), key=lambda member: member.header_offset):
+            if not info.is_dir():
+                with zip_ref.open(info) as src:
+                    yield info.filename, info.file_size, info.CRC, src
+
+
+def extract_archive(archive_path, dest_path, select):
+    """Extract the files of a cached zip or tar.zst that select() maps to a relative path.
+
+    Returns {relative_path: (size, crc32)} for every extracted file.
+    """
+    extracted = {}
+    for name, size, expected_crc, src in iter_archive_files(archive_path):
+        relative_path = select(name)
+        if relative_path is None:
+            continue
+        if '..' in relative_path.split('/') or relative_path.startswith('/'):
+            raise ArchiveCorrupted(f"Refusing to extract unsafe path {name}")
+
+        crc = 0
+        target_path = dest_path / relative_path
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(target_path, 'wb') as dst:
+            while chunk := src.read(COPY_BUFFER_SIZE):
+                crc = zlib.crc32(chunk, crc)
+                dst.write(chunk)
+
+        if crc != expected_crc:
+            raise ArchiveCorrupted(f"CRC mismatch for {name} in {archive_path.name}")
+        extracted[relative_path] = (size, crc)
+    return extracted
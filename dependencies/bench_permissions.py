@@ -0,0 +1,83 @@
+import os
+import stat
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import permissions
+
+RUNS = 3
+# Roughly the shape of an extracted llvm-mingw tree
+TREE_DIRS = 200
+FILES_PER_DIR = 50
+# Every Nth file is left without read access for others to exercise the repair path
+BROKEN_EVERY = 100
+
+
+def make_tree(root):
+    for dir_index in range(TREE_DIRS):
+        dir_path = root / f"dir{dir_index}"
+        dir_path.mkdir()
+        for file_index in range(FILES_PER_DIR):
+            file_path = dir_path / f"file{file_index}"
+            file_path.touch()
+            os.chmod(file_path, 0o755 if file_index % 10 == 0 else 0o644)
+
+
+def break_tree(root):
+    broken = 0
+    for index, path in enumerate(sorted(root.rglob("file*"))):
+        if index % BROKEN_EVERY == 0:
+            os.chmod(path, 0o600)
+            broken += 1
+    return broken
+
+
+def chmod_everything(root):
+    # What a recursive grant does: rewrite every entry regardless of its current state
+    for dir_path, dir_names, file_names in os.walk(root):
+        for name in dir_names + file_names:
+            path = os.path.join(dir_path, name)
+            mode = os.lstat(path).st_mode
+            os.chmod(path, stat.S_IMODE(mode) | permissions.PosixModeBackend.get_wanted_bits(mode))
+
+
+def time_pass(root, grant, broken):
+    timings = []
+    for _ in range(RUNS):
+        if broken:
+            break_tree(root)
+        start = time.perf_counter()
+        grant(root)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def bench_permissions():
+    backend = permissions.PosixModeBackend()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        make_tree(root)
+        entry_count = TREE_DIRS * (FILES_PER_DIR + 1)
+        broken_count = break_tree(root)
+        permissions.grant_read_execute(root, backend)
+
+        print(f"{entry_count} entries, {broken_count} broken per run (best of {RUNS})")
+        print(f"{'tree':<10} {'recursive (ms)':>15} {'only wrong (ms)':>16}")
+        for label, broken in (("correct", False), ("broken", True)):
+            recursive_time = time_pass(root, chmod_everything, broken)
+            selective_time = time_pass(root, lambda path: permissions.grant_read_execute(path, backend), broken)
+            print(f"{label:<10} {recursive_time * 1000:>15.1f} {selective_time * 1000:>16.1f}")
+
+        # The selective pass must leave nothing behind for a second pass to fix
+        break_tree(root)
+        permissions.grant_read_execute(root, backend)
+        return not permissions.find_entries_to_fix(root, backend)
+
+
+if __name__ == "__main__":
+    if os.name == 'nt':
+        print("bench_permissions.py exercises the POSIX backend; run it on Linux or macOS.")
+        sys.exit(1)
+    sys.exit(0 if bench_permissions() else 1)
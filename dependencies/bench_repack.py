@@ -0,0 +1,71 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import artifact_cache
+
+RUNS = 3
+
+
+def time_decompression(archive_path):
+    # Reads every member without touching the filesystem
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        for _, _, _, src in artifact_cache.iter_archive_files(archive_path):
+            while src.read(1024 * 1024):
+                pass
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def time_extraction(archive_path):
+    timings = []
+    for _ in range(RUNS):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            start = time.perf_counter()
+            artifact_cache.extract_archive(archive_path, Path(temp_dir), lambda name: name)
+            timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def bench_repack(zip_path):
+    if artifact_cache.get_zstd_module() is None:
+        print("zstd is unavailable (needs Python 3.14+ or zstandard).")
+        return False
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # Repack a private copy so the real cache is left alone
+        os.environ[artifact_cache.CACHE_DIR_ENV] = cache_dir
+        cached_zip_path = Path(cache_dir) / zip_path.name
+        shutil.copy2(zip_path, cached_zip_path)
+        artifact_cache.save_metadata(cached_zip_path, {"sha256": "bench", "size": zip_path.stat().st_size})
+
+        start = time.perf_counter()
+        repacked_path = artifact_cache.repack_artifact(cached_zip_path)
+        repack_time = time.perf_counter() - start
+
+        zip_decompress_time = time_decompression(cached_zip_path)
+        zstd_decompress_time = time_decompression(repacked_path)
+        zip_time = time_extraction(cached_zip_path)
+        zstd_time = time_extraction(repacked_path)
+        zip_size = cached_zip_path.stat().st_size
+        zstd_size = repacked_path.stat().st_size
+
+    print(f"One-off repack: {repack_time:.2f} s")
+    print(f"{'format':<8} {'size (MiB)':>11} {'decompress (s)':>15} {'extract (s)':>12}")
+    print(f"{'zip':<8} {zip_size / 2 ** 20:>11.1f} {zip_decompress_time:>15.2f} {zip_time:>12.2f}")
+    print(f"{'tar.zst':<8} {zstd_size / 2 ** 20:>11.1f} {zstd_decompress_time:>15.2f} {zstd_time:>12.2f}")
+    print(f"Decompression speedup: {zip_decompress_time / zstd_decompress_time:.2f}x, "
+          f"extraction speedup: {zip_time / zstd_time:.2f}x, size ratio: {zstd_size / zip_size:.2f}")
+    return True
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: bench_repack.py <path to release zip>")
+        sys.exit(1)
+    sys.exit(0 if bench_repack(Path(sys.argv[1])) else 1)
@@ -0,0 +1,56 @@
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+# Import overhead allowed on top of a bare interpreter start for a check-only run
+STARTUP_BUDGET_MS = 75
+RUNS = 15
+
+CHECK_MODULES = ("setup_cmake", "setup_ninja", "setup_compiler", "setup_vulkan", "setup_vs2022")
+
+# Only the download, prompt and rich-output paths may pull these in
+HEAVY_MODULES = ("requests", "urllib3", "rich")
+
+
+def time_interpreter(code):
+    timings = []
+    output = ""
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+        output = result.stdout.strip()
+    return statistics.median(timings), output
+
+
+def bench_startup(source_path):
+    baseline_ms, _ = time_interpreter("pass")
+    print(f"Bare interpreter: {baseline_ms:.1f} ms (median of {RUNS})")
+
+    within_budget = True
+    for module_name in CHECK_MODULES:
+        code = (f"import sys; sys.path.insert(0, {str(source_path)!r}); import {module_name}; "
+                f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+        elapsed_ms, heavy_loaded = time_interpreter(code)
+        overhead_ms = elapsed_ms - baseline_ms
+
+        status = "ok"
+        if heavy_loaded:
+            status = f"imports {heavy_loaded} eagerly"
+            within_budget = False
+        elif overhead_ms > STARTUP_BUDGET_MS:
+            status = f"over {STARTUP_BUDGET_MS} ms budget"
+            within_budget = False
+        print(f"{module_name:<16} {elapsed_ms:6.1f} ms (+{overhead_ms:5.1f} ms) {status}")
+
+    return within_budget
+
+
+if __name__ == "__main__":
+    # Benchmark the built zipapp when given, otherwise the scripts in place
+    source = Path(sys.argv[1]) if len(sys.argv) > 1 else SCRIPT_DIR
+    sys.exit(0 if bench_startup(source.resolve()) else 1)
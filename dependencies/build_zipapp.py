@@ -0,0 +1,58 @@
+import compileall
+import py_compile
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipapp
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+DEFAULT_OUTPUT_PATH = SCRIPT_DIR / "pytools.pyz"
+
+# Build and benchmark helpers are not needed at provision time
+EXCLUDED_SCRIPTS = {"build_zipapp.py"}
+
+
+def vendor_requirements(target_dir):
+    # Only pure-Python wheels can be imported from inside a zip, so never let
+    # pip pick a compiled wheel (e.g. charset-normalizer's mypyc build).
+    subprocess.run([
+        sys.executable, "-m", "pip", "install",
+        "--requirement", str(SCRIPT_DIR / "requirements.txt"),
+        "--target", str(target_dir),
+        "--only-binary=:all:",
+        "--platform", "any",
+        "--implementation", "py",
+        "--python-version", "3.9",
+        "--no-compile",
+        "--quiet",
+    ], check=True)
+
+    # Console entry points are useless inside the archive
+    shutil.rmtree(target_dir / "bin", ignore_errors=True)
+
+
+def build_zipapp(output_path=DEFAULT_OUTPUT_PATH):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        staging_dir = Path(temp_dir)
+        vendor_requirements(staging_dir)
+
+        for script_path in SCRIPT_DIR.glob("*.py"):
+            if script_path.name not in EXCLUDED_SCRIPTS and not script_path.name.startswith(("bench_", "test_")):
+                shutil.copy2(script_path, staging_dir / script_path.name)
+
+        # zipimport cannot write bytecode caches, so ship legacy-layout .pyc files
+        # next to the sources. They are only used by the same Python version as
+        # the one building the archive; other versions fall back to the sources.
+        compileall.compile_dir(staging_dir, quiet=1, legacy=True,
+                               invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+
+        # Stored rather than deflated: imports skip decompression at startup
+        zipapp.create_archive(staging_dir, output_path, compressed=False)
+
+    print(f"Built {output_path} ({output_path.stat().st_size / 2 ** 20:.1f} MiB)")
+
+
+if __name__ == "__main__":
+    build_zipapp(Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_OUTPUT_PATH)
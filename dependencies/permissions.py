@@ -0,0 +1,150 @@
+import os
+import stat
+import subprocess
+from pathlib import Path
+
+# Well-known SID of the Everyone group; unlike the name, it is not localized
+EVERYONE_SID = "*S-1-1-0"
+
+
+class PermissionsBackend:
+    """Grants read & execute on an install tree to all users.
+
+    prepare_root() runs once on the (still empty) install root so files created
+    beneath it pick up the grant; needs_fix() and fix() then repair only the
+    entries whose permissions are actually wrong.
+    """
+
+    def prepare_root(self, root):
+        raise NotImplementedError
+
+    def needs_fix(self, path):
+        raise NotImplementedError
+
+    def fix(self, paths):
+        raise NotImplementedError
+
+
+class WindowsAclBackend(PermissionsBackend):
+    DACL_SECURITY_INFORMATION = 0x4
+    UNPROTECTED_DACL_SECURITY_INFORMATION = 0x20000000
+    SE_DACL_PROTECTED = 0x1000
+    SE_FILE_OBJECT = 1
+
+    def prepare_root(self, root):
+        # One inheritable ACE on the root instead of rewriting every file's ACL
+        subprocess.run(["icacls", str(root), "/grant", f"{EVERYONE_SID}:(OI)(CI)(RX)", "/C", "/Q"],
+                       check=True, capture_output=True)
+
+    def needs_fix(self, path):
+        # Anything with inheritance disabled does not receive the root's ACE
+        import ctypes
+        from ctypes import wintypes
+
+        advapi32 = ctypes.windll.advapi32
+        needed = wintypes.DWORD()
+        advapi32.GetFileSecurityW(path, self.DACL_SECURITY_INFORMATION, None, 0, ctypes.byref(needed))
+        descriptor = ctypes.create_string_buffer(needed.value)
+        if not advapi32.GetFileSecurityW(path, self.DACL_SECURITY_INFORMATION, descriptor,
+                                         needed, ctypes.byref(needed)):
+            raise ctypes.WinError()
+
+        control = wintypes.WORD()
+        revision = wintypes.DWORD()
+        if not advapi32.GetSecurityDescriptorControl(descriptor, ctypes.byref(control), ctypes.byref(revision)):
+            raise ctypes.WinError()
+        return bool(control.value & self.SE_DACL_PROTECTED)
+
+    def fix(self, paths):
+        # Called in-process: an icacls run per entry would bring back the per-file
+        # process cost of a recursive grant on trees with many protected entries
+        import ctypes
+        from ctypes import wintypes
+
+        advapi32 = ctypes.WinDLL("advapi32")
+        kernel32 = ctypes.WinDLL("kernel32")
+        advapi32.GetNamedSecurityInfoW.argtypes = [wintypes.LPCWSTR, ctypes.c_int, wintypes.DWORD,
+                                                   ctypes.c_void_p, ctypes.c_void_p, ctypes.POINTER(ctypes.c_void_p),
+                                                   ctypes.c_void_p, ctypes.POINTER(ctypes.c_void_p)]
+        advapi32.SetNamedSecurityInfoW.argtypes = [wintypes.LPWSTR, ctypes.c_int, wintypes.DWORD, ctypes.c_void_p,
+                                                   ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p]
+        kernel32.LocalFree.argtypes = [ctypes.c_void_p]
+
+        for path in paths:
+            dacl = ctypes.c_void_p()
+            descriptor = ctypes.c_void_p()
+            error = advapi32.GetNamedSecurityInfoW(str(path), self.SE_FILE_OBJECT, self.DACL_SECURITY_INFORMATION,
+                                                   None, None, ctypes.byref(dacl), None, ctypes.byref(descriptor))
+            if error:
+                raise ctypes.WinError(error)
+            try:
+                # Keep the explicit entries and re-enable inheritance, like icacls /inheritance:e
+                error = advapi32.SetNamedSecurityInfoW(
+                    str(path), self.SE_FILE_OBJECT,
+                    self.DACL_SECURITY_INFORMATION | self.UNPROTECTED_DACL_SECURITY_INFORMATION,
+                    None, None, dacl, None)
+            finally:
+                kernel32.LocalFree(descriptor)
+            if error:
+                raise ctypes.WinError(error)
+
+
+class PosixModeBackend(PermissionsBackend):
+    # POSIX has no inheritance, so the root only gets its own bits and every
+    # entry is checked; chmod is issued only where bits are missing.
+
+    def prepare_root(self, root):
+        mode = os.stat(root).st_mode
+        os.chmod(root, stat.S_IMODE(mode) | 0o555)
+
+    @staticmethod
+    def get_wanted_bits(mode):
+        if stat.S_ISDIR(mode):
+            return 0o555
+        # Read for everyone; execute only for files that are executable at all
+        return 0o444 | (0o111 if mode & 0o111 else 0)
+
+    def needs_fix(self, path):
+        mode = os.lstat(path).st_mode
+        wanted = self.get_wanted_bits(mode)
+        return mode & wanted != wanted
+
+    def fix(self, paths):
+        for path in paths:
+            mode = os.lstat(path).st_mode
+            os.chmod(path, stat.S_IMODE(mode) | self.get_wanted_bits(mode))
+
+
+def get_permissions_backend():
+    return WindowsAclBackend() if os.name == 'nt' else PosixModeBackend()
+
+
+def find_entries_to_fix(root, backend):
+    # Read-only scan; a tree that is already correct costs no writes at all
+    pending = [root]
+    to_fix = []
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_symlink():
+                    continue
+                if backend.needs_fix(entry.path):
+                    to_fix.append(entry.path)
+                if entry.is_dir():
+                    pending.append(entry.path)
+    return to_fix
+
+
+def grant_read_execute(path, backend=None):
+    """Make path (a file or a tree) readable and executable by everyone.
+
+    Returns the paths whose permissions had to be changed.
+    """
+    backend = backend or get_permissions_backend()
+    path = Path(path)
+    if path.is_dir():
+        to_fix = find_entries_to_fix(path, backend)
+    else:
+        to_fix = [str(path)] if backend.needs_fix(str(path)) else []
+    backend.fix(to_fix)
+    return to_fix
@@ -0,0 +1,176 @@
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import artifact_cache
+
+PREFETCH_INTERVAL_SECONDS = 6 * 60 * 60
+# Local hours [start, end) in which downloads may run; the window may wrap past midnight
+DEFAULT_IDLE_HOURS = (1, 6)
+
+
+def print(*args, **kwargs):
+    # rich is only imported once something is actually rendered
+    from rich import print as rich_print
+    rich_print(*args, **kwargs)
+
+
+def print_header(message):
+    print(f"[cyan]{message}[/cyan]")
+
+
+def print_step(message):
+    print(f"[bright_blue]{message}[/bright_blue]")
+
+
+def print_success(message):
+    print(f"[bright_green]{message}[/bright_green]")
+
+
+def print_error(message):
+    print(f"[red]{message}[/red]")
+    sys.exit(1)
+
+
+def print_error_prompt(message):
+    print(f"[red]{message}[/red]")
+
+
+def print_warning(message):
+    print(f"[bright_yellow]{message}[/bright_yellow]")
+
+
+def get_configured_artifacts():
+    # The versions and URLs the setup scripts would install right now
+    import setup_cmake
+    import setup_compiler
+    import setup_ninja
+    import setup_vulkan
+
+    return {
+        "cmake": setup_cmake.CMAKE_URL,
+        "ninja": setup_ninja.NINJA_URL,
+        "llvm-mingw": setup_compiler.MINGW_LLVM_URL,
+        "vulkan": setup_vulkan.VULKAN_SDK_URL,
+    }
+
+
+def is_idle_hour(hour, idle_hours):
+    start, end = idle_hours
+    if start <= end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+
+def seconds_until_idle(now, idle_hours):
+    next_start = now.replace(hour=idle_hours[0], minute=0, second=0, microsecond=0)
+    if next_start <= now:
+        next_start += timedelta(days=1)
+    return (next_start - now).total_seconds()
+
+
+def prefetch_once(artifacts, keep_urls=None):
+    """Refresh every artifact in the cache; returns {name: "updated" | "unchanged" | "failed"}.
+
+    When keep_urls is given, cache entries for any other URL are pruned afterwards.
+    """
+    results = {}
+    for name, url in artifacts.items():
+        print_step(f"Checking {name}: {url}")
+        try:
+            # Conditional request: unchanged artifacts cost a single 304 response
+            if artifact_cache.refresh_artifact(url):
+                print_success(f"Staged and verified new {name} artifact.")
+                results[name] = "updated"
+            else:
+                print_success(f"{name} is up to date.")
+                results[name] = "unchanged"
+        except Exception as e:
+            # Downloads, zip checks and the tar.zst repack can all fail in their own
+            # ways; one bad artifact must not stop the daemon
+            print_error_prompt(f"Failed to prefetch {name}: {e}")
+            results[name] = "failed"
+
+    if keep_urls is not None:
+        for artifact_dir_name in artifact_cache.prune_cache(keep_urls):
+            print_warning(f"Removed stale cache entry {artifact_dir_name}.")
+    return results
+
+
+def run_daemon(artifacts, interval, idle_hours, keep_urls=None):
+    while True:
+        now = datetime.now()
+        if idle_hours is not None and not is_idle_hour(now.hour, idle_hours):
+            wait_seconds = seconds_until_idle(now, idle_hours)
+            print_step(f"Outside idle hours, sleeping {wait_seconds / 3600:.1f} h.")
+            time.sleep(wait_seconds)
+            continue
+
+        prefetch_once(artifacts, keep_urls)
+        time.sleep(interval)
+
+
+def parse_interval(value):
+    try:
+        interval = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected a number of seconds")
+    if interval <= 0:
+        raise argparse.ArgumentTypeError("interval must be a positive number of seconds")
+    return interval
+
+
+def parse_idle_hours(value):
+    if value == "any":
+        return None
+    try:
+        start, end = (int(hour) for hour in value.split('-'))
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected START-END hours, e.g. 1-6, or 'any'")
+    if not (0 <= start < 24 and 0 <= end < 24):
+        raise argparse.ArgumentTypeError("hours must be between 0 and 23")
+    if start == end:
+        raise argparse.ArgumentTypeError("START and END must differ; use 'any' to allow every hour")
+    return start, end
+
+
+def parse_artifact(value):
+    name, separator, url = value.partition('=')
+    if not separator:
+        raise argparse.ArgumentTypeError("expected NAME=URL")
+    return name, url
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stage new toolchain releases in the artifact cache off-hours.")
+    parser.add_argument("--cache-dir", default=os.environ.get(artifact_cache.CACHE_DIR_ENV),
+                        help=f"artifact cache directory (default: ${artifact_cache.CACHE_DIR_ENV})")
+    parser.add_argument("--once", action="store_true", help="check every artifact once and exit")
+    parser.add_argument("--interval", type=parse_interval, default=PREFETCH_INTERVAL_SECONDS,
+                        help="seconds between checks")
+    parser.add_argument("--idle-hours", type=parse_idle_hours, default=DEFAULT_IDLE_HOURS,
+                        help="local hours START-END in which to download, or 'any' (default: 1-6)")
+    parser.add_argument("--artifact", type=parse_artifact, action="append",
+                        help="NAME=URL to prefetch instead of the configured tools (repeatable)")
+    parser.add_argument("--prune", action="store_true", help="remove cached artifacts that are no longer configured")
+    args = parser.parse_args()
+
+    if not args.cache_dir:
+        print_error(f"Set {artifact_cache.CACHE_DIR_ENV} or pass --cache-dir.")
+    os.environ[artifact_cache.CACHE_DIR_ENV] = args.cache_dir
+
+    configured_artifacts = get_configured_artifacts()
+    artifacts = dict(args.artifact) if args.artifact else configured_artifacts
+    # Overrides are prefetched in addition to, never instead of, the configured tools' cache entries
+    keep_urls = {*configured_artifacts.values(), *artifacts.values()} if args.prune else None
+    if args.once:
+        results = prefetch_once(artifacts, keep_urls)
+        sys.exit(1 if "failed" in results.values() else 0)
+
+    run_daemon(artifacts, args.interval, args.idle_hours, keep_urls)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import io
+import zipfile
+from contextlib import contextmanager
+
+import requests
+import urllib3
+
+# Reading ahead through a gap is cheaper than opening a new ranged request
+# (and possibly a new TLS connection) for anything smaller than this.
+MAX_SKIP_BYTES = 1024 * 1024
+
+
+class RangeRequestsNotSupported(Exception):
+    pass
+
+
+class RemoteZipReader(io.RawIOBase):
+    """Seekable, read-only view of a remote file backed by HTTP Range requests.
+
+    A single open-ended ranged response is streamed for as long as reads stay
+    sequential, so a run of adjacent zip members costs one request. Seeking
+    elsewhere drops the stream and the next read opens a new one.
+    """
+
+    def __init__(self, url, session=None):
+        self._session = session or requests.Session()
+        self._response = None
+        self._stream_pos = None
+        self._pos = 0
+        self.request_count = 0
+
+        probe = self._get(url, "bytes=0-0")
+        try:
+            if probe.status_code != 206 or "Content-Range" not in probe.headers:
+                raise RangeRequestsNotSupported(f"Server does not honour range requests for {url}")
+            # Reuse the final URL so redirects (e.g. GitHub release assets) are only followed once
+            self.url = probe.url
+            self.size = int(probe.headers["Content-Range"].rsplit("/", 1)[1])
+        finally:
+            probe.close()
+
+    def _get(self, url, byte_range):
+        self.request_count += 1
+        response = self._session.get(url, headers={"Range": byte_range}, stream=True)
+        response.raise_for_status()
+        return response
+
+    def _close_stream(self):
+        if self._response is not None:
+            self._response.close()
+        self._response = None
+        self._stream_pos = None
+
+    def _open_stream(self):
+        self._close_stream()
+        self._response = self._get(self.url, f"bytes={self._pos}-")
+        if self._response.status_code != 206:
+            self._close_stream()
+            raise RangeRequestsNotSupported(f"Server ignored range request for {self.url}")
+        self._stream_pos = self._pos
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if self._pos < 0:
+            raise ValueError("Negative seek position")
+        return self._pos
+
+    def readinto(self, buffer):
+        if self._pos >= self.size:
+            return 0
+
+        gap = self._pos - self._stream_pos if self._response is not None else -1
+        if gap < 0 or gap > MAX_SKIP_BYTES:
+            self._open_stream()
+        elif gap:
+            self._discard(gap)
+
+        data = self._read_stream(min(len(buffer), self.size - self._pos))
+        buffer[:len(data)] = data
+        self._pos += len(data)
+        self._stream_pos += len(data)
+        return len(data)
+
+    def _discard(self, count):
+        while count:
+            data = self._read_stream(min(count, 64 * 1024))
+            count -= len(data)
+            self._stream_pos += len(data)
+
+    def _read_stream(self, count):
+        # response.raw bypasses requests' own error wrapping, so surface dropped or
+        # truncated streams as requests errors for callers to handle like any other
+        try:
+            data = self._response.raw.read(count)
+        except (urllib3.exceptions.HTTPError, OSError) as e:
+            self._close_stream()
+            raise requests.ConnectionError(f"Lost connection to {self.url}: {e}") from e
+        if not data:
+            self._close_stream()
+            raise requests.ConnectionError(f"Unexpected end of stream from {self.url}")
+        return data
+
+    def close(self):
+        self._close_stream()
+        super().close()
+
+
+@contextmanager
+def open_remote_zip(url, session=None):
+    """Open a remote zip without downloading it; members are fetched only when read."""
+    with RemoteZipReader(url, session) as reader, zipfile.ZipFile(reader) as zip_ref:
+        yield zip_ref
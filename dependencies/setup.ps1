@@ -96,44 +96,67 @@ else
     }
 }
 
-# Setup python virtual environment
-Write-Host "Configuring python virtual environment..." -ForegroundColor Blue
 $scriptDir = Split-Path -Path $MyInvocation.MyCommand.Definition -Parent
 Set-Location -Path $scriptDir
-$venvPath = Join-Path -Path $scriptDir -ChildPath "..\.venv"
 
-if (Test-Path $venvPath)
+# Prefer the self-contained zipapp built by build_zipapp.py; it vendors every
+# pip package, so no virtual environment or pip step is needed
+$zipAppPath = Join-Path -Path $scriptDir -ChildPath "pytools.pyz"
+$useZipApp = Test-Path $zipAppPath
+
+if ($useZipApp)
 {
-    Write-Host "Virtual environment already exists. skipping..." -ForegroundColor Yellow
+    Write-Host "Found pytools.pyz, skipping virtual environment setup..." -ForegroundColor Yellow
 }
 else
 {
-    Write-Host "Creating new virtual environment..." -ForegroundColor Blue
-    python -m venv $venvPath
-}
+    # Setup python virtual environment
+    Write-Host "Configuring python virtual environment..." -ForegroundColor Blue
+    $venvPath = Join-Path -Path $scriptDir -ChildPath "..\.venv"
 
-Write-Host "Activating python virtual environment..." -ForegroundColor Blue
-& "$venvPath\Scripts\Activate.ps1"
-if (-not ($env:VIRTUAL_ENV))
-{
-    Write-Host "ERROR: Failed to activate the virtual environment." -ForegroundColor Red
-    exit 1
-}
+    if (Test-Path $venvPath)
+    {
+        Write-Host "Virtual environment already exists. skipping..." -ForegroundColor Yellow
+    }
+    else
+    {
+        Write-Host "Creating new virtual environment..." -ForegroundColor Blue
+        python -m venv $venvPath
+    }
+
+    Write-Host "Activating python virtual environment..." -ForegroundColor Blue
+    & "$venvPath\Scripts\Activate.ps1"
+    if (-not ($env:VIRTUAL_ENV))
+    {
+        Write-Host "ERROR: Failed to activate the virtual environment." -ForegroundColor Red
+        exit 1
+    }
 
-# Upgrade pip
-Write-Host "Installing pip to virtual environment" -ForegroundColor Blue
-python -m pip install --upgrade pip
+    # Upgrade pip
+    Write-Host "Installing pip to virtual environment" -ForegroundColor Blue
+    python -m pip install --upgrade pip
 
-# Install required packages from requirements.txt
-if (Test-Path (Join-Path -Path $scriptDir -ChildPath "requirements.txt"))
-{
-    Write-Host "Installing required pip packages..." -ForegroundColor Blue
-    pip install -r (Join-Path -Path $scriptDir -ChildPath "requirements.txt")
+    # Install required packages from requirements.txt
+    if (Test-Path (Join-Path -Path $scriptDir -ChildPath "requirements.txt"))
+    {
+        Write-Host "Installing required pip packages..." -ForegroundColor Blue
+        pip install -r (Join-Path -Path $scriptDir -ChildPath "requirements.txt")
+    }
+    else
+    {
+        Write-Host "ERROR: requirements.txt not found." -ForegroundColor Red
+        exit 1
+    }
 }
-else
+
+# Arguments to run one of the setup scripts, either from the zipapp or in place
+function Get-ScriptArguments($scriptName, $command)
 {
-    Write-Host "ERROR: requirements.txt not found." -ForegroundColor Red
-    exit 1
+    if ($useZipApp)
+    {
+        return @($zipAppPath, $command)
+    }
+    return @(Join-Path -Path $scriptDir -ChildPath $scriptName)
 }
 
 Write-Host "Finished Python setup." -ForegroundColor Green
@@ -141,7 +164,7 @@ Write-Host "`n"
 
 
 # Run the Python script and capture the exit code
-$pythonCMakeScriptPath = Join-Path -Path $scriptDir -ChildPath "setup_cmake.py"
+$pythonCMakeScriptPath = Get-ScriptArguments "setup_cmake.py" "cmake"
 $pythonCMakeProcess = Start-Process -FilePath "python" -ArgumentList $pythonCMakeScriptPath -NoNewWindow -PassThru -Wait
 $pythonExitCode = $pythonCMakeProcess.ExitCode
 
@@ -151,7 +174,7 @@ if ($pythonExitCode -eq 1)
 }
 
 # Run the Python script and capture the exit code
-$pythonNinjaScriptPath = Join-Path -Path $scriptDir -ChildPath "setup_ninja.py"
+$pythonNinjaScriptPath = Get-ScriptArguments "setup_ninja.py" "ninja"
 $pythonNinjaProcess = Start-Process -FilePath "python" -ArgumentList $pythonNinjaScriptPath -NoNewWindow -PassThru -Wait
 $ninjaExitCode = $pythonNinjaProcess.ExitCode
 
@@ -161,7 +184,7 @@ if ($ninjaExitCode -eq 1)
 }
 
 # Run the Python script and capture the exit code
-$pythonClangScriptPath = Join-Path -Path $scriptDir -ChildPath "setup_compiler.py"
+$pythonClangScriptPath = Get-ScriptArguments "setup_compiler.py" "clang"
 $pythonClangProcess = Start-Process -FilePath "python" -ArgumentList $pythonClangScriptPath -NoNewWindow -PassThru -Wait
 $clangExitCode = $pythonClangProcess.ExitCode
 
@@ -171,7 +194,7 @@ if ($clangExitCode -eq 1)
 }
 
 # Run the Python script and capture the exit code
-$pythonVulkanScriptPath = Join-Path -Path $scriptDir -ChildPath "setup_vulkan.py"
+$pythonVulkanScriptPath = Get-ScriptArguments "setup_vulkan.py" "vulkan"
 $pythonVulkanProcess = Start-Process -FilePath "python" -ArgumentList $pythonVulkanScriptPath -NoNewWindow -PassThru -Wait
 $vulkanExitCode = $pythonVulkanProcess.ExitCode
 
@@ -354,7 +377,7 @@ catch
 
 
 # Run the Python script and capture the exit code
-$pythonVS2022ScriptPath = Join-Path -Path $scriptDir -ChildPath "setup_vs2022.py"
+$pythonVS2022ScriptPath = Get-ScriptArguments "setup_vs2022.py" "vs2022"
 $pythonVS2022Process = Start-Process -FilePath "python" -ArgumentList $pythonVS2022ScriptPath -NoNewWindow -PassThru -Wait
 $vs2022ExitCode = $pythonVS2022Process.ExitCode
 
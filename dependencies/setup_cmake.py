@@ -4,12 +4,19 @@ import subprocess
 import sys
 import tempfile
 from pathlib import Path
-import requests
-from rich import print
-from rich.prompt import Prompt
 
 CMAKE_MINIMUM_REQUIRED_VERSION = (3, 22, 0)
 
+CMAKE_VERSION = "3.31.1"
+CMAKE_URL = (f"https://github.com/Kitware/CMake/releases/download/v{CMAKE_VERSION}/"
+             f"cmake-{CMAKE_VERSION}-windows-x86_64.msi")
+
+
+def print(*args, **kwargs):
+    # rich is only imported once something is actually rendered
+    from rich import print as rich_print
+    rich_print(*args, **kwargs)
+
 
 def print_header(message):
     print(f"[cyan]{message}[/cyan]")
@@ -37,7 +44,15 @@ def print_warning(message):
 
 
 def download_file(url, dest_path):
-    print_step("Downloading CMake 3.31.1 installer...")
+    import artifact_cache
+
+    if artifact_cache.is_cache_enabled():
+        artifact_cache.copy_from_cache(url, dest_path)
+        return
+
+    import requests
+
+    print_step(f"Downloading CMake {CMAKE_VERSION} installer...")
     response = requests.get(url)
     if response.status_code == 200:
         with open(dest_path, "wb") as f:
@@ -70,6 +85,8 @@ def install_cmake(installer_path):
 
 
 def prompt_and_install_cmake():
+    from rich.prompt import Prompt
+
     response = Prompt.ask(
         "[bright_green]Would you like to install CMake 3.31.1? (Y/n)[/bright_green]",
         default="Y",
@@ -83,11 +100,10 @@ def prompt_and_install_cmake():
 
 
 def setup_cmake():
-    installer_url = "https://github.com/Kitware/CMake/releases/download/v3.31.1/cmake-3.31.1-windows-x86_64.msi"
     temp_dir = tempfile.gettempdir()
-    installer_path = Path(temp_dir) / "cmake-3.31.1-windows-x86_64.msi"
+    installer_path = Path(temp_dir) / CMAKE_URL.rsplit('/', 1)[-1]
 
-    download_file(installer_url, installer_path)
+    download_file(CMAKE_URL, installer_path)
     install_cmake(installer_path)
 
     print_success("Finished CMake setup\n\n")
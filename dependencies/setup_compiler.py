@@ -1,19 +1,32 @@
-import ctypes
 import re
 import shutil
 import subprocess
 import sys
 import tempfile
-import winreg
-import zipfile
 from pathlib import Path
 
-import requests
-from rich import print
-from rich.prompt import Prompt
-
 CLANG_MINIMUM_REQUIRED_VERSION = (11, 0, 0)
 
+MINGW_LLVM_VERSION = "20241119"
+MINGW_LLVM_URL = (f"https://github.com/mstorsjo/llvm-mingw/releases/download/{MINGW_LLVM_VERSION}/"
+                  f"llvm-mingw-{MINGW_LLVM_VERSION}-ucrt-x86_64.zip")
+MINGW_LLVM_INSTALL_PATH = Path('C:/Program Files/MinGW-LLVM')
+
+# Target triples bundled in the llvm-mingw release and their compiler-rt arch suffix
+MINGW_LLVM_TARGETS = {
+    "i686-w64-mingw32": "i386",
+    "x86_64-w64-mingw32": "x86_64",
+    "armv7-w64-mingw32": "arm",
+    "aarch64-w64-mingw32": "aarch64",
+}
+MINGW_LLVM_DEFAULT_TARGETS = ("x86_64-w64-mingw32",)
+
+
+def print(*args, **kwargs):
+    # rich is only imported once something is actually rendered
+    from rich import print as rich_print
+    rich_print(*args, **kwargs)
+
 
 def print_header(message):
     print(f"[cyan]{message}[/cyan]")
@@ -41,6 +54,8 @@ def print_warning(message):
 
 
 def download_file(url, dest_path):
+    import requests
+
     with requests.get(url, stream=True) as response:
         response.raise_for_status()  # Raises an error for bad status codes
         with open(dest_path, 'wb') as f:
@@ -49,53 +64,154 @@ def download_file(url, dest_path):
                     f.write(chunk)
 
 
-def download_and_extract_mingw_llvm(url, dest_path):
-    print_step("Downloading MinGW-LLVM repository zip...")
-    mingw_llvm_zip_path = dest_path / 'llvm-mingw.zip'
+def is_mingw_llvm_member_wanted(member_path, targets):
+    # Drop per-target sysroots, target-prefixed tool wrappers and compiler-rt
+    # libraries for every triple that was not selected; host tools are always kept.
+    parts = member_path.split('/')
+    for triple, compiler_rt_arch in MINGW_LLVM_TARGETS.items():
+        if triple in targets:
+            continue
+        if any(part.startswith(triple) for part in parts):
+            return False
+        if parts[:2] == ['lib', 'clang'] and f"-{compiler_rt_arch}." in parts[-1]:
+            return False
+    return True
+
+
+def get_top_level_prefix(names):
+    # The release zip wraps everything in a single llvm-mingw-<version>-... folder
+    top_level_dirs = {name.split('/', 1)[0] for name in names}
+    if len(top_level_dirs) == 1 and all('/' in name for name in names):
+        return f"{top_level_dirs.pop()}/"
+    return ""
+
+
+def get_mingw_llvm_member_selector(names, targets):
+    # Maps an archive member name to its path under the install root, or None to skip it
+    prefix = get_top_level_prefix(names)
+
+    def select(name):
+        relative_path = name[len(prefix):]
+        if relative_path and is_mingw_llvm_member_wanted(relative_path, targets):
+            return relative_path
+        return None
+
+    return select
+
+
+def select_mingw_llvm_members(zip_ref, targets):
+    infos = zip_ref.infolist()
+    select = get_mingw_llvm_member_selector([info.filename for info in infos], targets)
+    selected = []
+    for info in infos:
+        relative_path = select(info.filename)
+        if relative_path is not None:
+            selected.append((info, relative_path))
+
+    # Extract in archive order so ranged reads of adjacent members share one stream
+    selected.sort(key=lambda member: member[0].header_offset)
+    return selected
+
+
+def extract_mingw_llvm_members(zip_ref, dest_path, targets):
+    selected = select_mingw_llvm_members(zip_ref, targets)
+    total_size = sum(info.compress_size for info in zip_ref.infolist())
+    selected_size = sum(info.compress_size for info, _ in selected)
+    print_step(f"Extracting {selected_size / 2 ** 20:.1f} MiB of {total_size / 2 ** 20:.1f} MiB "
+               f"for {', '.join(targets)}...")
+
+    for info, relative_path in selected:
+        if '..' in relative_path.split('/') or relative_path.startswith('/'):
+            print_error(f"Refusing to extract unsafe path {info.filename}.")
+
+        target_path = dest_path / relative_path
+        if info.is_dir():
+            target_path.mkdir(parents=True, exist_ok=True)
+            continue
+
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        with zip_ref.open(info) as src, open(target_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
 
+    return {relative_path: (info.file_size, info.CRC) for info, relative_path in selected if not info.is_dir()}
+
+
+def fetch_and_extract_mingw_llvm(url, dest_path, targets):
+    import zipfile
+
+    from remote_zip import RangeRequestsNotSupported, open_remote_zip
+
+    print_step("Reading MinGW-LLVM archive index...")
+    try:
+        # Only the central directory and the selected members are downloaded
+        with open_remote_zip(url) as zip_ref:
+            return extract_mingw_llvm_members(zip_ref, dest_path, targets)
+    except RangeRequestsNotSupported:
+        print_warning("Server does not support ranged downloads, downloading the full archive...")
+
+    mingw_llvm_zip_path = dest_path / 'llvm-mingw.zip'
     download_file(url, mingw_llvm_zip_path)
     print_success("Download completed successfully.")
 
-    print_step("Extracting MinGW-LLVM repository contents...")
-
-    # Extract zip to destination path
     with zipfile.ZipFile(mingw_llvm_zip_path, 'r') as zip_ref:
-        zip_ref.extractall(dest_path)
+        extracted = extract_mingw_llvm_members(zip_ref, dest_path, targets)
 
     # Cleanup zip file after extraction
     mingw_llvm_zip_path.unlink()
+    return extracted
+
 
-    # Find the main subdirectory (assuming one top-level folder exists)
-    subdirectories = [p for p in dest_path.iterdir() if p.is_dir()]
-    if len(subdirectories) == 1:
-        main_subdir = subdirectories[0]
+def extract_mingw_llvm_from_cache(url, dest_path, targets):
+    import artifact_cache
 
-        print_step(f"Moving files from {main_subdir.name} to {dest_path}...")
+    def get_select(archive_path):
+        print_step(f"Extracting {archive_path.name} for {', '.join(targets)}...")
+        return get_mingw_llvm_member_selector(artifact_cache.list_archive_names(archive_path), targets)
 
-        # Move all contents from the subdirectory to the target directory
-        for item in main_subdir.iterdir():
-            shutil.move(str(item), dest_path / item.name)
+    # Streams from the tar.zst repack when PYTOOLS_CACHE_REPACK=1, else from the cached zip
+    return artifact_cache.extract_cached_artifact(url, dest_path, get_select)
 
-        # Remove the now-empty directory
-        main_subdir.rmdir()
 
-    print_success("Extraction and reorganization completed.")
+def download_and_extract_mingw_llvm(url, dest_path, targets=MINGW_LLVM_DEFAULT_TARGETS):
+    import zipfile
 
-    extracted_files = list(dest_path.rglob('*'))
-    print(f"Extracted {len(extracted_files)} files.")
+    import requests
 
+    import artifact_cache
+    from verify_install import write_install_manifest
 
-def grant_clang_permissions(bin_path):
-    everyone = "Everyone"
-    # Grant permissions recursively to the entire directory and its contents
-    command = f'icacls "{bin_path}" /grant {everyone}:(RX) /T /C /Q >nul 2>&1'
-    result = subprocess.run(command, shell=True)
+    try:
+        if artifact_cache.is_cache_enabled():
+            extracted = extract_mingw_llvm_from_cache(url, dest_path, targets)
+        else:
+            extracted = fetch_and_extract_mingw_llvm(url, dest_path, targets)
+    except (requests.RequestException, zipfile.BadZipFile, artifact_cache.ArchiveCorrupted) as e:
+        print_error(f"Failed to download MinGW-LLVM: {e}")
 
-    if result.returncode != 0:
-        print_error(f"Failed to grant permissions for {bin_path}.")
+    # Record what was installed so `verify_install.py clang` can audit it later
+    write_install_manifest(dest_path, url, extracted, targets=list(targets))
+
+    print_success("Extraction completed.")
+    print(f"Extracted {len(extracted)} files.")
+
+
+def grant_clang_permissions(install_path, backend=None):
+    from permissions import grant_read_execute
+
+    try:
+        # Only entries whose effective permissions are wrong are touched
+        fixed_paths = grant_read_execute(install_path, backend)
+    except (OSError, subprocess.CalledProcessError):
+        print_error(f"Failed to grant permissions for {install_path}.")
+
+    if fixed_paths:
+        print_warning(f"Fixed permissions on {len(fixed_paths)} files.")
 
 
 def add_mingw_llvm_to_system_path(dest_path):
+    import ctypes
+    import winreg
+
     bin_path = str(Path(dest_path) / "bin")
     try:
         # Open the registry key for system environment variables
@@ -121,6 +237,8 @@ def add_mingw_llvm_to_system_path(dest_path):
 
 
 def prompt_and_install_clang():
+    from rich.prompt import Prompt
+
     response = Prompt.ask(
         "[bright_green]Would you like to install Clang 19.1.4? (Y/n)[/bright_green]",
         default="Y",
@@ -162,16 +280,29 @@ def check_compiler_version(minimum_version=CLANG_MINIMUM_REQUIRED_VERSION):
         return False
 
 
-def setup_clang():
-    installer_url = "https://github.com/mstorsjo/llvm-mingw/releases/download/20241119/llvm-mingw-20241119-ucrt-x86_64.zip"
-    dest_install_path = Path('C:/Program Files/MinGW-LLVM')
-    dest_install_path.mkdir(parents=True, exist_ok=True)
+def setup_clang(targets=MINGW_LLVM_DEFAULT_TARGETS):
+    unknown_targets = [target for target in targets if target not in MINGW_LLVM_TARGETS]
+    if unknown_targets:
+        print_error(f"Unsupported target triple(s): {', '.join(unknown_targets)}. "
+                    f"Available: {', '.join(MINGW_LLVM_TARGETS)}.")
+
+    from permissions import get_permissions_backend
+    from staged_install import staged_install
+
+    dest_install_path = MINGW_LLVM_INSTALL_PATH
+    permissions_backend = get_permissions_backend()
 
-    download_and_extract_mingw_llvm(installer_url, dest_install_path)
+    # Populate a versioned staging directory and switch it in only once complete,
+    # so builds never see a half-extracted toolchain
+    with staged_install(dest_install_path, MINGW_LLVM_VERSION) as staging_path:
+        # Grant read & execute once on the empty root so extracted files inherit it
+        try:
+            permissions_backend.prepare_root(staging_path)
+        except (OSError, subprocess.CalledProcessError):
+            print_error(f"Failed to grant permissions for {staging_path}.")
 
-    # Grant permissions for the bin directory
-    bin_path = dest_install_path / "bin"
-    grant_clang_permissions(bin_path)
+        download_and_extract_mingw_llvm(MINGW_LLVM_URL, staging_path, targets)
+        grant_clang_permissions(staging_path, permissions_backend)
 
     add_mingw_llvm_to_system_path(dest_install_path)
 
@@ -4,15 +4,19 @@ import subprocess
 import sys
 import tempfile
 from pathlib import Path
-import requests
-from rich import print
-from rich.prompt import Prompt
-import winreg
-import zipfile
-import ctypes
 
 NINJA_MINIMUM_REQUIRED_VERSION = (1, 12, 1)
 
+NINJA_VERSION = "1.12.1"
+NINJA_URL = f"https://github.com/ninja-build/ninja/releases/download/v{NINJA_VERSION}/ninja-win.zip"
+NINJA_INSTALL_PATH = Path('C:/Program Files/Ninja')
+
+
+def print(*args, **kwargs):
+    # rich is only imported once something is actually rendered
+    from rich import print as rich_print
+    rich_print(*args, **kwargs)
+
 
 def print_header(message):
     print(f"[cyan]{message}[/cyan]")
@@ -39,35 +43,73 @@ def print_warning(message):
     print(f"[bright_yellow]{message}[/bright_yellow]")
 
 
-def download_and_extract_ninja(url, dest_path):
+def select_ninja_member(name):
+    return name if name == "ninja.exe" else None
+
+
+def select_ninja_members(zip_ref):
+    return [(info, info.filename) for info in zip_ref.infolist() if select_ninja_member(info.filename)]
+
+
+def download_ninja(url, temp_dir, dest_path):
+    import zipfile
+
+    import requests
+
     print_step("Downloading Ninja installer...")
-    with tempfile.TemporaryDirectory() as temp_dir:
-        ninja_zip_path = Path(temp_dir) / 'ninja-win.zip'
-
-        # Download the Ninja zip file
-        response = requests.get(url, stream=True)
-        if response.status_code == 200:
-            with open(ninja_zip_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            print_success("Download completed successfully.")
-        else:
-            print_error(f"Error: Failed to download file. Status code: {response.status_code}")
+    ninja_zip_path = Path(temp_dir) / 'ninja-win.zip'
+
+    # Download the Ninja zip file
+    response = requests.get(url, stream=True)
+    if response.status_code == 200:
+        with open(ninja_zip_path, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=8192):
+                f.write(chunk)
+        print_success("Download completed successfully.")
+    else:
+        print_error(f"Error: Failed to download file. Status code: {response.status_code}")
+
+    # Extract straight into the destination: files created there inherit its ACL,
+    # whereas a file moved in from %TEMP% would keep the temp directory's ACL
+    with zipfile.ZipFile(ninja_zip_path, 'r') as zip_ref:
+        selected = select_ninja_members(zip_ref)
+        for info, _ in selected:
+            zip_ref.extract(info, dest_path)
+        return {relative_path: (info.file_size, info.CRC) for info, relative_path in selected}
+
+
+def download_and_extract_ninja(url, dest_path, backend=None):
+    import zipfile
 
-        # Extract the zip file to the temporary directory
-        with zipfile.ZipFile(ninja_zip_path, 'r') as zip_ref:
-            zip_ref.extractall(temp_dir)
+    import requests
 
-        # Verify if ninja.exe exists
-        extracted_ninja_path = Path(temp_dir) / "ninja.exe"
+    import artifact_cache
+    from verify_install import write_install_manifest
 
-        if extracted_ninja_path.exists():
-            dest_ninja_path = Path(dest_path) / "ninja.exe"
-            dest_ninja_path.parent.mkdir(parents=True, exist_ok=True)  # Ensure directory exists
-            extracted_ninja_path.replace(dest_ninja_path)
-            grant_ninja_permissions(dest_ninja_path)
+    dest_path = Path(dest_path)
+    dest_path.mkdir(parents=True, exist_ok=True)  # Ensure directory exists
+
+    try:
+        if artifact_cache.is_cache_enabled():
+            # Streams from the tar.zst repack when PYTOOLS_CACHE_REPACK=1, else from the cached zip
+            expected = artifact_cache.extract_cached_artifact(url, dest_path, lambda _: select_ninja_member)
         else:
-            print_error("ninja.exe not found in extracted contents.")
+            # Only the downloaded zip goes to a temporary directory
+            with tempfile.TemporaryDirectory() as temp_dir:
+                expected = download_ninja(url, temp_dir, dest_path)
+    except (requests.RequestException, zipfile.BadZipFile, artifact_cache.ArchiveCorrupted) as e:
+        print_error(f"Failed to download Ninja: {e}")
+
+    # Verify if ninja.exe exists
+    dest_ninja_path = dest_path / "ninja.exe"
+
+    if dest_ninja_path.exists():
+        grant_ninja_permissions(dest_ninja_path, backend)
+
+        # Record what was installed so `verify_install.py ninja` can audit it later
+        write_install_manifest(dest_path, url, expected)
+    else:
+        print_error("ninja.exe not found in extracted contents.")
 
 
 def install_ninja(installer_path):
@@ -79,15 +121,22 @@ def install_ninja(installer_path):
     print_success("Ninja was installed successfully.")
 
 
-def grant_ninja_permissions(ninja_exe_path):
-    # Set permissions for "Everyone" to read & execute
-    everyone = "Everyone"
-    command = f'icacls "{ninja_exe_path}" /grant {everyone}:(RX) /T /C /Q'
-    subprocess.run(command, shell=True, check=True)
-    print_success("Granted read and execute permissions to all users for ninja.exe.")
+def grant_ninja_permissions(ninja_exe_path, backend=None):
+    from permissions import grant_read_execute
+
+    try:
+        # Set permissions for "Everyone" to read & execute, unless it already inherits them
+        fixed_paths = grant_read_execute(ninja_exe_path, backend)
+    except (OSError, subprocess.CalledProcessError):
+        print_error(f"Failed to grant permissions for {ninja_exe_path}.")
+
+    if fixed_paths:
+        print_success("Granted read and execute permissions to all users for ninja.exe.")
 
 
 def add_ninja_to_system_path(ninja_path):
+    import winreg
+
     ninja_binary_path = str(ninja_path)
     try:
         # Open the registry key for environment variables
@@ -119,6 +168,8 @@ def add_ninja_to_system_path(ninja_path):
 
 
 def prompt_and_install_ninja():
+    from rich.prompt import Prompt
+
     response = Prompt.ask(
         "[bright_green]Would you like to install Ninja? (Y/n)[/bright_green]",
         default="Y",
@@ -170,10 +221,21 @@ def check_ninja_version(minimum_version=NINJA_MINIMUM_REQUIRED_VERSION):
 
 
 def setup_ninja():
-    installer_url = "https://github.com/ninja-build/ninja/releases/download/v1.12.1/ninja-win.zip"
-    dest_install_path = Path('C:/Program Files/Ninja')
+    from permissions import get_permissions_backend
+    from staged_install import staged_install
+
+    dest_install_path = NINJA_INSTALL_PATH
+    permissions_backend = get_permissions_backend()
+
+    # Stage ninja.exe in a versioned directory and switch it in with one link swap
+    with staged_install(dest_install_path, NINJA_VERSION) as staging_path:
+        # Grant read & execute on the root before ninja.exe is extracted into it so it inherits it
+        try:
+            permissions_backend.prepare_root(staging_path)
+        except (OSError, subprocess.CalledProcessError):
+            print_error(f"Failed to grant permissions for {staging_path}.")
 
-    download_and_extract_ninja(installer_url, dest_install_path)
+        download_and_extract_ninja(NINJA_URL, staging_path, permissions_backend)
     add_ninja_to_system_path(dest_install_path)
 
     print_success("Finished Ninja setup\n\n")
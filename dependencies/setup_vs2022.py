@@ -3,38 +3,40 @@ import os
 import subprocess
 import sys
 import tempfile
+from functools import lru_cache
 from pathlib import Path
 
-import requests
-from rich.console import Console
-from rich.prompt import Prompt
 
-console = Console(color_system="auto", force_terminal=True)
+@lru_cache(maxsize=None)
+def get_console():
+    # rich is only imported once something is actually rendered
+    from rich.console import Console
+    return Console(color_system="auto", force_terminal=True)
 
 
 def print_header(message):
-    console.print(f"[cyan]{message}[/cyan]")
+    get_console().print(f"[cyan]{message}[/cyan]")
 
 
 def print_step(message):
-    console.print(f"[bright_blue]{message}[/bright_blue]")
+    get_console().print(f"[bright_blue]{message}[/bright_blue]")
 
 
 def print_success(message):
-    console.print(f"[bright_green]{message}[/bright_green]")
+    get_console().print(f"[bright_green]{message}[/bright_green]")
 
 
 def print_error(message):
-    console.print(f"[red]{message}[/red]")
+    get_console().print(f"[red]{message}[/red]")
     sys.exit(1)
 
 
 def print_error_prompt(message):
-    console.print(f"[red]{message}[/red]")
+    get_console().print(f"[red]{message}[/red]")
 
 
 def print_warning(message):
-    console.print(f"[bright_yellow]{message}[/bright_yellow]")
+    get_console().print(f"[bright_yellow]{message}[/bright_yellow]")
 
 
 VS_BUILD_TOOLS_URL = "https://aka.ms/vs/17/release/vs_BuildTools.exe"
@@ -47,6 +49,8 @@ INSTALL_COMMAND = [
 
 
 def download_file(url, dest_path):
+    import requests
+
     print_step("Downloading Visual Studio 2022 Build Tools installer...")
     response = requests.get(url)
     if response.status_code == 200:
@@ -95,6 +99,8 @@ def display_paths(instances, instance_type):
 
 
 def prompt_and_install_vs_component(missing_component):
+    from rich.prompt import Prompt
+
     response = Prompt.ask(
         f"[bright_green]Would you like to install the missing Desktop Development with C++workload? (Y/n)[/bright_green]",
         default="Y",
@@ -108,6 +114,8 @@ def prompt_and_install_vs_component(missing_component):
 
 
 def prompt_and_install_vs2022_build_tools():
+    from rich.prompt import Prompt
+
     response = Prompt.ask(
         f"[bright_green]Would you like to install Visual Studio 2022 Build Tools for C++? (Y/n)[/bright_green]",
         default="Y",
@@ -3,9 +3,15 @@ import sys
 import os
 import tempfile
 
-import requests
-from rich import print
-from rich.prompt import Prompt
+VULKAN_SDK_VERSION = "1.3.296.0"
+VULKAN_SDK_URL = (f"https://sdk.lunarg.com/sdk/download/{VULKAN_SDK_VERSION}/windows/"
+                  f"VulkanSDK-{VULKAN_SDK_VERSION}-Installer.exe")
+
+
+def print(*args, **kwargs):
+    # rich is only imported once something is actually rendered
+    from rich import print as rich_print
+    rich_print(*args, **kwargs)
 
 
 def print_header(message):
@@ -34,6 +40,14 @@ def print_warning(message):
 
 
 def download_file(url, dest_path):
+    import artifact_cache
+
+    if artifact_cache.is_cache_enabled():
+        artifact_cache.copy_from_cache(url, dest_path)
+        return
+
+    import requests
+
     print_step("Downloading Vulkan SDK installer...")
     try:
         response = requests.get(url)
@@ -72,15 +86,16 @@ def install_vulkan(installer_path):
 
 
 def setup_vulkan():
-    url = "https://sdk.lunarg.com/sdk/download/1.3.296.0/windows/VulkanSDK-1.3.296.0-Installer.exe"
     installer_path = os.path.join(tempfile.gettempdir(), "VulkanSDK-Installer.exe")
 
-    download_file(url, installer_path)
+    download_file(VULKAN_SDK_URL, installer_path)
     install_vulkan(installer_path)
     print_success("Finished Vulkan SDK setup\n\n")
 
 
 def prompt_and_install_vulkan():
+    from rich.prompt import Prompt
+
     response = Prompt.ask(
         "[bright_green]Would you like to install the Vulkan SDK 1.3.204.0? (Y/n)[/bright_green]",
         default="Y",
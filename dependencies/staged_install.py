@@ -0,0 +1,275 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+STATE_NAME = "state.json"
+LEGACY_VERSION_NAME = "legacy"
+
+
+def print(*args, **kwargs):
+    # rich is only imported once something is actually rendered
+    from rich import print as rich_print
+    rich_print(*args, **kwargs)
+
+
+def print_header(message):
+    print(f"[cyan]{message}[/cyan]")
+
+
+def print_step(message):
+    print(f"[bright_blue]{message}[/bright_blue]")
+
+
+def print_success(message):
+    print(f"[bright_green]{message}[/bright_green]")
+
+
+def print_error(message):
+    print(f"[red]{message}[/red]")
+    sys.exit(1)
+
+
+def print_error_prompt(message):
+    print(f"[red]{message}[/red]")
+
+
+def print_warning(message):
+    print(f"[bright_yellow]{message}[/bright_yellow]")
+
+
+def get_versions_dir(install_root):
+    # e.g. C:/Program Files/MinGW-LLVM -> C:/Program Files/MinGW-LLVM.versions
+    return install_root.with_name(f"{install_root.name}.versions")
+
+
+def is_link(path):
+    # os.readlink understands both symlinks and Windows directory junctions
+    try:
+        os.readlink(path)
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+def create_link(link_path, target_path):
+    if os.name == 'nt':
+        # Junctions need no special privileges, unlike directory symlinks
+        subprocess.run(['cmd', '/c', 'mklink', '/J', str(link_path), str(target_path)],
+                       check=True, capture_output=True)
+    else:
+        os.symlink(target_path, link_path, target_is_directory=True)
+
+
+def remove_link(link_path):
+    # Removes the link itself, never the directory it points to
+    if os.name == 'nt':
+        os.rmdir(link_path)
+    else:
+        os.unlink(link_path)
+
+
+def load_state(install_root):
+    try:
+        with open(get_versions_dir(install_root) / STATE_NAME, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(install_root, state):
+    state_path = get_versions_dir(install_root) / STATE_NAME
+    temp_path = state_path.with_suffix(".tmp")
+    with open(temp_path, 'w') as f:
+        json.dump(state, f)
+    os.replace(temp_path, state_path)
+
+
+def get_current_version(install_root):
+    if not is_link(install_root):
+        return None
+    return Path(os.readlink(install_root)).name
+
+
+def migrate_legacy_install(install_root):
+    # Installs made before staging was introduced are plain directories; keep
+    # them as a version of their own so the first staged install can be rolled back.
+    if install_root.exists() and not is_link(install_root):
+        legacy_path = get_versions_dir(install_root) / LEGACY_VERSION_NAME
+        if legacy_path.exists():
+            shutil.rmtree(legacy_path)
+        os.rename(install_root, legacy_path)
+        create_link(install_root, legacy_path)
+
+
+def retarget_junction(link_path, target_path):
+    # Overwrites the junction's mount point reparse data in place, so the link
+    # switches to the new target in a single step and never stops existing.
+    import ctypes
+    from ctypes import wintypes
+
+    GENERIC_WRITE = 0x40000000
+    OPEN_EXISTING = 3
+    FILE_FLAG_OPEN_REPARSE_POINT = 0x00200000
+    FILE_FLAG_BACKUP_SEMANTICS = 0x02000000
+    FSCTL_SET_REPARSE_POINT = 0x000900A4
+    IO_REPARSE_TAG_MOUNT_POINT = 0xA0000003
+
+    target_path = os.path.abspath(target_path)
+    substitute_name = f"\\??\\{target_path}".encode("utf-16-le")
+    print_name = target_path.encode("utf-16-le")
+    null = "\0".encode("utf-16-le")
+    path_buffer = substitute_name + null + print_name + null
+    # REPARSE_DATA_BUFFER: tag, data length, reserved, then the MountPointReparseBuffer
+    reparse_data = (IO_REPARSE_TAG_MOUNT_POINT.to_bytes(4, 'little')
+                    + (8 + len(path_buffer)).to_bytes(2, 'little') + bytes(2)
+                    + (0).to_bytes(2, 'little') + len(substitute_name).to_bytes(2, 'little')
+                    + (len(substitute_name) + len(null)).to_bytes(2, 'little')
+                    + len(print_name).to_bytes(2, 'little')
+                    + path_buffer)
+
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.CreateFileW.restype = wintypes.HANDLE
+    kernel32.CreateFileW.argtypes = [wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD, wintypes.LPVOID,
+                                     wintypes.DWORD, wintypes.DWORD, wintypes.HANDLE]
+    kernel32.DeviceIoControl.argtypes = [wintypes.HANDLE, wintypes.DWORD, wintypes.LPVOID, wintypes.DWORD,
+                                         wintypes.LPVOID, wintypes.DWORD, ctypes.POINTER(wintypes.DWORD),
+                                         wintypes.LPVOID]
+    kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+
+    handle = kernel32.CreateFileW(str(link_path), GENERIC_WRITE, 0, None, OPEN_EXISTING,
+                                  FILE_FLAG_OPEN_REPARSE_POINT | FILE_FLAG_BACKUP_SEMANTICS, None)
+    if handle == wintypes.HANDLE(-1).value:
+        raise ctypes.WinError(ctypes.get_last_error())
+    try:
+        buffer = ctypes.create_string_buffer(reparse_data, len(reparse_data))
+        returned = wintypes.DWORD()
+        if not kernel32.DeviceIoControl(handle, FSCTL_SET_REPARSE_POINT, buffer, len(reparse_data),
+                                        None, 0, ctypes.byref(returned), None):
+            raise ctypes.WinError(ctypes.get_last_error())
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def swap_link(install_root, version_path):
+    if os.name == 'nt':
+        # Windows cannot rename onto an existing junction, so rewrite its target instead
+        if is_link(install_root):
+            retarget_junction(install_root, version_path)
+        else:
+            create_link(install_root, version_path)
+        return
+
+    swap_path = install_root.with_name(f"{install_root.name}.swap")
+    if is_link(swap_path):
+        remove_link(swap_path)
+    create_link(swap_path, version_path)
+    # rename(2) atomically replaces the old symlink
+    os.replace(swap_path, install_root)
+
+
+def activate_version(install_root, version_name):
+    version_path = get_versions_dir(install_root) / version_name
+    if not version_path.is_dir():
+        print_error(f"{version_path} does not exist.")
+
+    current_version = get_current_version(install_root)
+    if current_version == version_name:
+        return
+
+    swap_link(install_root, version_path)
+    save_state(install_root, {"current": version_name, "previous": current_version})
+
+
+def prune_versions(install_root):
+    # Keep only the active version and the one it replaced
+    state = load_state(install_root)
+    keep = {state.get("current"), state.get("previous"), STATE_NAME}
+    for path in get_versions_dir(install_root).iterdir():
+        if path.name not in keep and not path.name.endswith(".staging"):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def get_unique_version_name(versions_dir, version):
+    # Timestamps have one-second resolution, so back-to-back installs get a counter
+    base_name = f"{version}-{time.strftime('%Y%m%d%H%M%S')}"
+    version_name = base_name
+    counter = 1
+    while (versions_dir / version_name).exists() or (versions_dir / f"{version_name}.staging").exists():
+        version_name = f"{base_name}-{counter}"
+        counter += 1
+    return version_name
+
+
+@contextmanager
+def staged_install(install_root, version):
+    """Yield an empty staging directory for version.
+
+    When the block completes, the staged tree is switched in as install_root with
+    a single link swap and the previously active version is kept for rollback. If
+    the block fails, the staging directory is discarded and the live install is
+    left untouched.
+    """
+    install_root = Path(install_root)
+    versions_dir = get_versions_dir(install_root)
+    versions_dir.mkdir(parents=True, exist_ok=True)
+
+    version_name = get_unique_version_name(versions_dir, version)
+    staging_path = versions_dir / f"{version_name}.staging"
+    version_path = versions_dir / version_name
+    staging_path.mkdir()
+
+    try:
+        yield staging_path
+    except BaseException:
+        shutil.rmtree(staging_path, ignore_errors=True)
+        raise
+
+    try:
+        os.rename(staging_path, version_path)
+        migrate_legacy_install(install_root)
+        activate_version(install_root, version_name)
+    except BaseException:
+        # The switch did not happen, so nothing refers to the new tree; prune_versions
+        # never removes staging directories, so discard it here.
+        if get_current_version(install_root) != version_name:
+            shutil.rmtree(staging_path, ignore_errors=True)
+            shutil.rmtree(version_path, ignore_errors=True)
+        raise
+    prune_versions(install_root)
+    print_success(f"Activated {version_name} at {install_root}.")
+
+
+def rollback(install_root):
+    state = load_state(install_root)
+    previous_version = state.get("previous")
+    if not previous_version:
+        print_error(f"No previous version of {install_root} to roll back to.")
+
+    activate_version(install_root, previous_version)
+    print_success(f"Rolled {install_root} back to {previous_version}.")
+
+
+TOOLS = ("clang", "ninja")
+
+
+if __name__ == "__main__":
+    from verify_install import get_install_root
+
+    if len(sys.argv) != 3 or sys.argv[1] not in ("rollback", "status") or sys.argv[2] not in TOOLS:
+        print_error(f"Usage: staged_install.py rollback|status {'|'.join(TOOLS)}")
+
+    command, tool = sys.argv[1:]
+    install_root = get_install_root(tool)
+    if command == "rollback":
+        rollback(install_root)
+    else:
+        state = load_state(install_root)
+        print_header(f"{tool.upper()} INSTALL: {install_root}")
+        print(f"Current version: {get_current_version(install_root) or 'not staged'}")
+        print(f"Previous version: {state.get('previous') or 'none'}")
+    sys.exit(0)
@@ -0,0 +1,107 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+import zipfile
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+import artifact_cache
+import prefetch
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    # SimpleHTTPRequestHandler answers If-Modified-Since with 304, like a release server
+    def log_message(self, format, *args):
+        pass
+
+
+def write_zip(path, payload, mtime):
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zip_ref:
+        zip_ref.writestr("ninja.exe", payload)
+    os.utime(path, (mtime, mtime))
+
+
+class PrefetchTest(unittest.TestCase):
+    def setUp(self):
+        self.serve_dir = Path(tempfile.mkdtemp())
+        self.cache_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.serve_dir, True)
+        self.addCleanup(shutil.rmtree, self.cache_dir, True)
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=str(self.serve_dir)))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        self.url = f"http://127.0.0.1:{server.server_port}/ninja-win.zip"
+        self.artifacts = {"ninja": self.url}
+        self.archive_path = self.serve_dir / "ninja-win.zip"
+        self.mtime = time.time() - 3600
+
+        environ = mock.patch.dict(os.environ, {artifact_cache.CACHE_DIR_ENV: str(self.cache_dir)})
+        environ.start()
+        self.addCleanup(environ.stop)
+        os.environ.pop(artifact_cache.REPACK_ENV, None)
+        # Keep the rich output out of the test log
+        for module in (prefetch, artifact_cache):
+            patcher = mock.patch.object(module, "print")
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def get_cached_payload(self):
+        with zipfile.ZipFile(artifact_cache.get_artifact_path(self.url), 'r') as zip_ref:
+            return zip_ref.read("ninja.exe")
+
+    def test_first_download_then_unchanged(self):
+        write_zip(self.archive_path, b"v1", self.mtime)
+
+        self.assertEqual(prefetch.prefetch_once(self.artifacts), {"ninja": "updated"})
+        self.assertEqual(self.get_cached_payload(), b"v1")
+        self.assertEqual(prefetch.prefetch_once(self.artifacts), {"ninja": "unchanged"})
+
+    def test_updated_artifact(self):
+        write_zip(self.archive_path, b"v1", self.mtime)
+        prefetch.prefetch_once(self.artifacts)
+
+        write_zip(self.archive_path, b"v2", self.mtime + 60)
+        self.assertEqual(prefetch.prefetch_once(self.artifacts), {"ninja": "updated"})
+        self.assertEqual(self.get_cached_payload(), b"v2")
+
+    def test_truncated_artifact_fails_and_keeps_cached_copy(self):
+        write_zip(self.archive_path, b"v1", self.mtime)
+        prefetch.prefetch_once(self.artifacts)
+
+        write_zip(self.archive_path, os.urandom(64 * 1024), self.mtime + 60)
+        data = self.archive_path.read_bytes()
+        self.archive_path.write_bytes(data[:len(data) // 2])
+        os.utime(self.archive_path, (self.mtime + 60, self.mtime + 60))
+
+        self.assertEqual(prefetch.prefetch_once(self.artifacts), {"ninja": "failed"})
+        self.assertEqual(self.get_cached_payload(), b"v1")
+
+    def test_corrupt_artifact_fails(self):
+        write_zip(self.archive_path, os.urandom(64 * 1024), self.mtime)
+        data = bytearray(self.archive_path.read_bytes())
+        data[len(data) // 2] ^= 0xFF
+        self.archive_path.write_bytes(bytes(data))
+
+        self.assertEqual(prefetch.prefetch_once(self.artifacts), {"ninja": "failed"})
+        self.assertFalse(artifact_cache.get_artifact_path(self.url).exists())
+
+    def test_prune_keeps_listed_urls(self):
+        write_zip(self.archive_path, b"v1", self.mtime)
+        stale_dir = artifact_cache.get_artifact_dir("https://example.com/old.zip")
+        stale_dir.mkdir(parents=True)
+
+        prefetch.prefetch_once(self.artifacts, keep_urls=[self.url])
+        self.assertFalse(stale_dir.exists())
+        self.assertTrue(artifact_cache.get_artifact_path(self.url).exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,235 @@
+import json
+import mmap
+import os
+import sys
+import tempfile
+import zipfile
+import zlib
+from pathlib import Path
+
+MANIFEST_NAME = ".install-manifest.json"
+
+
+def print(*args, **kwargs):
+    # rich is only imported once something is actually rendered
+    from rich import print as rich_print
+    rich_print(*args, **kwargs)
+
+
+def print_header(message):
+    print(f"[cyan]{message}[/cyan]")
+
+
+def print_step(message):
+    print(f"[bright_blue]{message}[/bright_blue]")
+
+
+def print_success(message):
+    print(f"[bright_green]{message}[/bright_green]")
+
+
+def print_error(message):
+    print(f"[red]{message}[/red]")
+    sys.exit(1)
+
+
+def print_error_prompt(message):
+    print(f"[red]{message}[/red]")
+
+
+def print_warning(message):
+    print(f"[bright_yellow]{message}[/bright_yellow]")
+
+
+def file_crc32(path):
+    with open(path, 'rb') as f:
+        # Empty files cannot be memory-mapped
+        if os.fstat(f.fileno()).st_size == 0:
+            return 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            # zlib releases the GIL on large buffers, so threads hash in parallel
+            return zlib.crc32(mapped)
+
+
+def load_install_manifest(install_root):
+    try:
+        with open(Path(install_root) / MANIFEST_NAME, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_install_manifest(install_root, source_url, expected, **details):
+    # Record size, CRC32 and mtime of every installed file so later audits can
+    # skip hashing anything whose size and mtime are unchanged.
+    install_root = Path(install_root)
+    files = {}
+    for relative_path, (size, crc) in expected.items():
+        try:
+            stat = (install_root / relative_path).stat()
+        except OSError:
+            continue
+        files[relative_path] = [size, crc, stat.st_mtime_ns]
+
+    manifest = {"source_url": source_url, **details, "files": files}
+    with open(install_root / MANIFEST_NAME, 'w') as f:
+        json.dump(manifest, f)
+
+
+def list_installed_files(install_root):
+    installed = {}
+    for dir_path, _, file_names in os.walk(install_root):
+        for file_name in file_names:
+            path = Path(dir_path) / file_name
+            relative_path = path.relative_to(install_root).as_posix()
+            if relative_path != MANIFEST_NAME:
+                installed[relative_path] = path
+    return installed
+
+
+def verify_install(install_root, expected):
+    """Compare an install against {relative_path: (size, crc32)} from its archive.
+
+    Returns sorted lists of missing, modified and extra relative paths.
+    """
+    install_root = Path(install_root)
+    manifest = load_install_manifest(install_root)
+    recorded = manifest.get("files", {})
+    installed = list_installed_files(install_root)
+
+    missing = sorted(set(expected) - set(installed))
+    extra = sorted(set(installed) - set(expected))
+    modified = []
+    to_hash = []
+
+    for relative_path in sorted(set(expected) & set(installed)):
+        size, crc = expected[relative_path]
+        stat = installed[relative_path].stat()
+        if stat.st_size != size:
+            modified.append(relative_path)
+            continue
+
+        # Fast path: unchanged size and mtime since a recorded, matching install
+        if recorded.get(relative_path) == [size, crc, stat.st_mtime_ns]:
+            continue
+        to_hash.append(relative_path)
+
+    if to_hash:
+        from concurrent.futures import ThreadPoolExecutor
+
+        print_step(f"Hashing {len(to_hash)} of {len(expected)} files...")
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            crcs = executor.map(file_crc32, [installed[path] for path in to_hash])
+            for relative_path, crc in zip(to_hash, crcs):
+                if crc != expected[relative_path][1]:
+                    modified.append(relative_path)
+
+        # Refresh the manifest so verified files take the fast path next time
+        if manifest:
+            verified = {path: expected[path] for path in expected if path in installed and path not in modified}
+            details = {key: value for key, value in manifest.items() if key not in ("source_url", "files")}
+            try:
+                write_install_manifest(install_root, manifest["source_url"], verified, **details)
+            except OSError:
+                pass
+
+    return missing, sorted(modified), extra
+
+
+def read_archive_index(url, select_members):
+    """Return {relative_path: (size, crc32)} for the archive members chosen by select_members.
+
+    Only the central directory is downloaded when the server supports range requests.
+    """
+    import requests
+
+    from remote_zip import RangeRequestsNotSupported, open_remote_zip
+
+    try:
+        with open_remote_zip(url) as zip_ref:
+            selected = select_members(zip_ref)
+    except RangeRequestsNotSupported:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            zip_path = Path(temp_dir) / 'archive.zip'
+            with requests.get(url, stream=True) as response:
+                response.raise_for_status()
+                with open(zip_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=1024 * 1024):
+                        f.write(chunk)
+            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+                selected = select_members(zip_ref)
+
+    return {relative_path: (info.file_size, info.CRC)
+            for info, relative_path in selected if not info.is_dir()}
+
+
+def expected_clang_files(install_root):
+    import setup_compiler
+
+    manifest = load_install_manifest(install_root)
+    targets = tuple(manifest.get("targets", setup_compiler.MINGW_LLVM_DEFAULT_TARGETS))
+    url = manifest.get("source_url", setup_compiler.MINGW_LLVM_URL)
+    return read_archive_index(url, lambda zip_ref: setup_compiler.select_mingw_llvm_members(zip_ref, targets))
+
+
+def expected_ninja_files(install_root):
+    import setup_ninja
+
+    url = load_install_manifest(install_root).get("source_url", setup_ninja.NINJA_URL)
+    return read_archive_index(url, setup_ninja.select_ninja_members)
+
+
+def get_install_root(tool):
+    if tool == "clang":
+        import setup_compiler
+        return setup_compiler.MINGW_LLVM_INSTALL_PATH
+
+    import setup_ninja
+    return setup_ninja.NINJA_INSTALL_PATH
+
+
+VERIFIERS = {
+    "clang": expected_clang_files,
+    "ninja": expected_ninja_files,
+}
+
+
+def verify_tool(tool):
+    import requests
+
+    install_root = get_install_root(tool)
+    print_header(f"VERIFYING {tool.upper()} INSTALL FILES: {install_root}")
+    if not install_root.is_dir():
+        print_error_prompt(f"{install_root} does not exist.")
+        return False
+
+    try:
+        expected = VERIFIERS[tool](install_root)
+    except (requests.RequestException, zipfile.BadZipFile) as e:
+        print_error_prompt(f"Failed to read the {tool} release archive: {e}")
+        return False
+
+    missing, modified, extra = verify_install(install_root, expected)
+    for label, paths in (("Missing", missing), ("Modified", modified), ("Extra", extra)):
+        for relative_path in paths:
+            print_error_prompt(f"{label}: {relative_path}")
+
+    if missing or modified:
+        print_error_prompt(f"{len(missing)} missing, {len(modified)} modified and {len(extra)} extra files.")
+        return False
+
+    if extra:
+        print_warning(f"All {len(expected)} files match, but {len(extra)} extra files were found.")
+    else:
+        print_success(f"All {len(expected)} files match the release archive.")
+    return True
+
+
+if __name__ == "__main__":
+    tools = sys.argv[1:] or list(VERIFIERS)
+    unknown_tools = [tool for tool in tools if tool not in VERIFIERS]
+    if unknown_tools:
+        print_error(f"Unknown tool(s): {', '.join(unknown_tools)}. Available: {', '.join(VERIFIERS)}.")
+
+    results = [verify_tool(tool) for tool in tools]
+    sys.exit(0 if all(results) else 1)